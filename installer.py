@@ -1,42 +1,135 @@
 #!/usr/bin/env python3
 import os
 import sys
+import atexit
 import subprocess
 import re
+import shlex
+import codecs
+import json
 import time
-import shutil
 import platform
 import math
-import datetime
-import fcntl
-import struct
+import functools
+import signal
 import select
+import selectors
+import queue
+import logging
+import logging.handlers
+from concurrent.futures import ThreadPoolExecutor
 from getpass import getpass
 from itertools import cycle
 
+try:
+    from wcwidth import wcswidth
+except ImportError:  # wcwidth необязателен, без него считаем ширину по len()
+    wcswidth = None
+
 # --- КОНФИГУРАЦИЯ ---
 LOG_DIR = "/Quasar--installer"
 LOG_FILE = f"{LOG_DIR}/install.log"
 INSTALLER_DIR = os.path.dirname(os.path.abspath(__file__))
 
+# Сведения о системе для заголовка лога (platform.platform() может вызывать uname)
+_PLATFORM = platform.platform()
+_PYVER = sys.version.split()[0]
+_LOG = logging.getLogger("quasar")
+_LOG_Q = queue.SimpleQueue()  # Записи для фонового потока QueueListener
+LOG_MAX_BYTES = 2_000_000  # Размер, после которого лог ротируется
+LOG_BACKUP_COUNT = 3  # Сколько старых логов хранить (install.log.1..3)
+
+# Множитель пауз после сообщений об ошибках (QUASAR_UI_DELAY=0 отключает их)
+try:
+    UI_DELAY = float(os.environ.get("QUASAR_UI_DELAY", "1"))
+except ValueError:
+    UI_DELAY = 1.0  # Нечисловое значение игнорируем, а не падаем при запуске
+
+# Спиннер для долгих команд
+SPINNER = cycle("|/-\\")
+SPINNER_INTERVAL = 0.1  # секунд между кадрами (не чаще 10 раз в секунду)
+_LINE_SPLIT = re.compile(r"\r\n|[\r\n]")
+# Строки вывода pacman (LC_ALL=C): итог транзакции и установка пакета
+_PACMAN_TOTAL = re.compile(r"^Packages \((\d+)\)")
+_PACMAN_INSTALLING = re.compile(r"^(?:\(\s*\d+/\d+\)\s+)?(?:installing|upgrading|reinstalling) ")
+_SHELL_CHARS = frozenset("|&;<>$`()*?[]{}~#\\\n")  # Без них строку можно разобрать shlex
+_PARTITION_LINE = re.compile(r"^/.*$", re.M)  # Строки разделов в выводе fdisk
+_PARALLEL_DOWNLOADS = re.compile(r"^#\s*ParallelDownloads\b.*$", re.M)
+PARALLEL_DOWNLOADS = 8  # Одновременных загрузок pacman
+
 # Создаем директорию для логов
 os.makedirs(LOG_DIR, exist_ok=True)
 
 # --- ФУНКЦИИ ЛОГИРОВАНИЯ ---
+class PhaseFileHandler(logging.handlers.RotatingFileHandler):
+    """Файл лога, который сбрасывается на диск только на границах фаз"""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Размер файла считаем сами: shouldRollover делает stat и seek
+        # на каждую запись, а seek сбрасывает буфер
+        self.written = self.stream.tell()
+    
+    def flush(self):
+        # Не сбрасываем буфер после каждой записи; файл всё равно
+        # сбрасывается при ротации и закрытии
+        pass
+    
+    def doRollover(self):
+        super().doRollover()
+        self.written = 0
+    
+    def emit(self, record):
+        if getattr(record, "phase_end", False):
+            if self.stream:
+                self.stream.flush()
+            return
+        try:
+            msg = self.format(record) + self.terminator
+            size = len(msg.encode(self.encoding or "utf-8"))
+            if self.maxBytes and self.written + size > self.maxBytes:
+                self.doRollover()
+            self.stream.write(msg)
+            self.written += size
+        except Exception:
+            self.handleError(record)
+
 def log_init():
     """Инициализация лог-файла"""
-    with open(LOG_FILE, "w") as f:
-        f.write(f"Quasar Linux Installer Log\n")
-        f.write(f"Started at: {datetime.datetime.now()}\n")
-        f.write(f"Python version: {sys.version}\n")
-        f.write(f"System: {platform.platform()}\n")
-        f.write("-" * 80 + "\n")
+    handler = PhaseFileHandler(
+        LOG_FILE, maxBytes=LOG_MAX_BYTES, backupCount=LOG_BACKUP_COUNT, encoding="utf-8"
+    )
+    # Каждый запуск начинается с нового файла, прошлые остаются в install.log.N
+    if handler.stream.tell() > 0:
+        handler.doRollover()
+    handler.setFormatter(logging.Formatter("[%(asctime)s] %(message)s", "%Y-%m-%d %H:%M:%S"))
+    handler.stream.write(
+        f"Quasar Linux Installer Log\n"
+        f"Started at: {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime())}\n"
+        f"Python version: {_PYVER}\n"
+        f"System: {_PLATFORM}\n"
+        + "-" * 80 + "\n"
+    )
+    handler.stream.flush()
+    handler.written = handler.stream.tell()
+    
+    # В файл пишет фоновый поток QueueListener, log_message только ставит запись в очередь
+    listener = logging.handlers.QueueListener(_LOG_Q, handler)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    _LOG.setLevel(logging.DEBUG)
+    _LOG.propagate = False
+    _LOG.addHandler(logging.handlers.QueueHandler(_LOG_Q))
 
 def log_message(message):
     """Запись сообщения в лог"""
-    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    with open(LOG_FILE, "a") as f:
-        f.write(f"[{timestamp}] {message}\n")
+    _LOG.info(message)
+
+def log_flush():
+    """Сбрасывает накопленные записи на диск (вызывается по окончании фазы)"""
+    # Маркер проходит через ту же очередь, поэтому сбрасывает всё, что было до него
+    _LOG.info("", extra={"phase_end": True})
 
 def log_command(cmd, output, error=None):
     """Логирование выполнения команды"""
@@ -47,24 +140,44 @@ def log_command(cmd, output, error=None):
         log_message(f"ERROR: {error}")
 
 # --- УТИЛИТЫ ТЕРМИНАЛА ---
+_TERM_SIZE = None  # (ширина, высота); сбрасывается обработчиком SIGWINCH
+
 def get_terminal_size():
-    """Получаем размер терминала"""
+    """Получаем размер терминала (кэшируется до SIGWINCH)"""
+    global _TERM_SIZE
+    if _TERM_SIZE is not None:
+        return _TERM_SIZE
     try:
-        h, w, _, _ = struct.unpack('HHHH', 
-            fcntl.ioctl(0, termios.TIOCGWINSZ, 
-            struct.pack('HHHH', 0, 0, 0, 0)))
-        return w, h
-    except:
-        return 80, 24  # Стандартный размер
+        size = os.get_terminal_size(0)
+        # Последовательная консоль может сообщить нулевой размер
+        _TERM_SIZE = (size.columns or 80, size.lines or 24)
+    except OSError:
+        _TERM_SIZE = (80, 24)  # Стандартный размер
+    return _TERM_SIZE
+
+def _on_winch(signum, frame):
+    """Сбрасывает кэш размера терминала при его изменении"""
+    global _TERM_SIZE
+    _TERM_SIZE = None
+    _render_header.cache_clear()
 
 # --- ПРОГРЕСС-БАРЫ ---
 class ProgressBar:
+    REDRAW_INTERVAL = 1 / 30  # Не чаще 30 перерисовок в секунду
+    
     def __init__(self, total, description="", width=50):
         self.total = total
         self.description = description
         self.width = width
         self.current = 0
         self.start_time = time.time()
+        self._last_draw = 0.0
+        self._last_filled = -1
+        # Полосы нужной длины вырезаются из готовых строк, без умножения на каждом кадре
+        self._full_bar = '█' * width
+        self._empty_bar = '-' * width
+        self._desc_key = None  # (ширина, описание), для которых собран _desc
+        self._desc = ""
         
     def update(self, value):
         """Обновляем прогресс"""
@@ -80,7 +193,16 @@ class ProgressBar:
         """Рисуем прогресс-бар"""
         percent = self.current / self.total
         filled = int(self.width * percent)
-        bar = '█' * filled + '-' * (self.width - filled)
+        
+        # Пропускаем перерисовку, если полоса не изменилась и прошло мало времени
+        now = time.monotonic()
+        if (filled == self._last_filled and now - self._last_draw < self.REDRAW_INTERVAL
+                and self.current != self.total):
+            return
+        self._last_filled = filled
+        self._last_draw = now
+        
+        bar = self._full_bar[:filled] + self._empty_bar[filled:]
         elapsed = time.time() - self.start_time
         
         # Расчет оставшегося времени
@@ -93,10 +215,13 @@ class ProgressBar:
         # Центрирование
         term_width, _ = get_terminal_size()
         desc_width = term_width - self.width - 20
-        desc = (self.description[:desc_width] + '..') if len(self.description) > desc_width else self.description
+        if self._desc_key != (desc_width, self.description):
+            desc = (self.description[:desc_width] + '..') if len(self.description) > desc_width else self.description
+            self._desc = desc.ljust(desc_width)
+            self._desc_key = (desc_width, self.description)
         
         # Форматированная строка
-        progress_str = f"\r{desc.ljust(desc_width)} |{bar}| {percent*100:.1f}% [{self.current}/{self.total}] ⏱{time_str}"
+        progress_str = f"\r{self._desc} |{bar}| {percent*100:.1f}% [{self.current}/{self.total}] ⏱{time_str}"
         sys.stdout.write(progress_str)
         sys.stdout.flush()
         
@@ -106,21 +231,59 @@ class ProgressBar:
         print()
 
 # --- ИНТЕРФЕЙСНЫЕ ФУНКЦИИ ---
-def clear_screen():
-    os.system('clear')
+CLEAR_SEQ = "\x1b[H\x1b[J"  # Курсор в начало и очистка до конца экрана
+_STDOUT_IS_TTY = sys.stdout.isatty()  # Вывод в файл не засоряем escape-кодами
+
+def ui_pause(seconds):
+    """Пауза, чтобы пользователь успел прочитать ошибку перед перерисовкой"""
+    # Без терминала читать некому, поэтому не ждём
+    if UI_DELAY and _STDOUT_IS_TTY:
+        time.sleep(seconds * UI_DELAY)
+
+# Баннер не меняется, поэтому собираем его один раз при импорте
+_BANNER = (
+    "",
+    "Quasar Linux Installer",
+    "",
+    "██████╗ ██╗   ██╗ █████╗ ███████╗ █████╗ ██████╗",
+    "██╔═══██╗██║   ██║██╔══██╗██╔════╝██╔══██╗██╔══██╗",
+    "██║   ██║██║   ██║███████║███████╗███████║██████╔╝",
+    "██║▄▄ ██║██║   ██║██╔══██║╚════██║██╔══██║██╔══██╗",
+    "╚██████╔╝╚██████╔╝██║  ██║███████║██║  ██║██║  ██║",
+    " ╚══▀▀═╝  ╚═════╝ ╚═╝  ╚═╝╚══════╝╚═╝  ╚═╝╚═╝  ╚═╝",
+    "",
+)
+
+@functools.lru_cache(maxsize=1024)
+def center_text(text, width=80):
+    """Центрирует строку в поле заданной ширины (результат кэшируется)"""
+    # Ширина в ячейках терминала может отличаться от числа символов
+    cells = wcswidth(text) if wcswidth else -1
+    if cells < 0 or cells == len(text):
+        return text.center(width)
+    pad = max(0, width - cells)
+    return " " * (pad // 2) + text + " " * (pad - pad // 2)
+
+@functools.lru_cache(maxsize=8)
+def _borders(width):
+    """Горизонтальные линии рамки (верх, разделитель, низ) для ширины width"""
+    hline = "─" * (width - 2)
+    return "┌" + hline + "┐", "├" + hline + "┤", "└" + hline + "┘"
 
 def draw_box(title, content=None, footer=None):
     """Рисует красивый центрированный блок"""
     term_width, _ = get_terminal_size()
     width = min(term_width - 4, 100)
     
-    # Верхняя граница
-    box = "┌" + "─" * (width - 2) + "┐\n"
+    inner = width - 4
+    top, separator, bottom = _borders(width)
     
-    # Заголовок
-    title_line = "│" + title.center(width - 2) + "│\n"
-    box += title_line
-    box += "├" + "─" * (width - 2) + "┤\n"
+    # Верхняя граница и заголовок
+    parts = [
+        top,
+        "│" + center_text(title, width - 2) + "│",
+        separator,
+    ]
     
     # Контент
     if content:
@@ -128,117 +291,296 @@ def draw_box(title, content=None, footer=None):
             content = [content]
             
         for line in content:
-            if len(line) > width - 4:
-                # Перенос длинных строк
-                parts = [line[i:i+width-4] for i in range(0, len(line), width-4)]
-                for part in parts:
-                    box += "│ " + part.ljust(width - 4) + " │\n"
-            else:
-                box += "│ " + line.ljust(width - 4) + " │\n"
+            # Перенос длинных строк
+            chunks = [line[i:i+inner] for i in range(0, len(line), inner)] or [""]
+            parts.extend("│ " + chunk.ljust(inner) + " │" for chunk in chunks)
     
     # Нижняя граница
     if footer:
-        box += "├" + "─" * (width - 2) + "┤\n"
-        if len(footer) > width - 4:
-            footer_parts = [footer[i:i+width-4] for i in range(0, len(footer), width-4)]
-            for part in footer_parts:
-                box += "│ " + part.center(width - 4) + " │\n"
-        else:
-            box += "│ " + footer.center(width - 4) + " │\n"
+        parts.append(separator)
+        footer_parts = [footer[i:i+inner] for i in range(0, len(footer), inner)]
+        parts.extend("│ " + center_text(part, inner) + " │" for part in footer_parts)
     
-    box += "└" + "─" * (width - 2) + "┘"
-    return box
+    parts.append(bottom)
+    return "\n".join(parts)
 
-def print_header():
-    clear_screen()
+@functools.lru_cache(maxsize=4)
+def _render_header(width):
+    """Собирает шапку с баннером для заданной ширины, уже в байтах"""
+    top, _, bottom = _borders(width)
+    lines = [f"│{center_text(line, width - 2)}│" for line in _BANNER]
+    header = "\n".join(["", top, *lines, bottom, "", ""])
+    # Очистка экрана входит в кэш вместе с шапкой
+    if _STDOUT_IS_TTY:
+        header = CLEAR_SEQ + header
+    return header.encode("utf-8")
+
+def print_header(body=None):
+    """Перерисовывает экран: шапка и необязательный блок body одной записью"""
     term_width, _ = get_terminal_size()
-    width = min(term_width - 4, 100)
-    
-    header = f"""
-┌{"─" * (width - 2)}┐
-│{" " * (width - 2)}│
-│{"Quasar Linux Installer".center(width - 2)}│
-│{" " * (width - 2)}│
-│{"██████╗ ██╗   ██╗ █████╗ ███████╗ █████╗ ██████╗".center(width - 2)}│
-│{"██╔═══██╗██║   ██║██╔══██╗██╔════╝██╔══██╗██╔══██╗".center(width - 2)}│
-│{"██║   ██║██║   ██║███████║███████╗███████║██████╔╝".center(width - 2)}│
-│{"██║▄▄ ██║██║   ██║██╔══██║╚════██║██╔══██║██╔══██╗".center(width - 2)}│
-│{"╚██████╔╝╚██████╔╝██║  ██║███████║██║  ██║██║  ██║".center(width - 2)}│
-│{" ╚══▀▀═╝  ╚═════╝ ╚═╝  ╚═╝╚══════╝╚═╝  ╚═╝╚═╝  ╚═╝".center(width - 2)}│
-│{" " * (width - 2)}│
-└{"─" * (width - 2)}┘
-"""
-    print(header)
+    screen = _render_header(min(term_width - 4, 100))
+    if body:
+        screen += (body + "\n").encode("utf-8")
+    # Текстовый буфер сбрасываем раньше, чтобы порядок вывода не нарушился;
+    # шапка уже закодирована и идёт в двоичный поток без TextIOWrapper
+    sys.stdout.flush()
+    sys.stdout.buffer.write(screen)
+    sys.stdout.buffer.flush()
     log_message("Displayed main header")
 
 # --- СИСТЕМНЫЕ ФУНКЦИИ ---
-def run_command(cmd, exit_on_error=True, show_progress=False, progress_desc=""):
-    """Выполняет команду с возможным отображением прогресса"""
-    log_message(f"Executing: {cmd}")
+def stream_process(process, on_line, spinner=True, stdin_data=None):
+    """Читает stdout и stderr процесса одновременно, пока оба не закроются
+    
+    Каждая непустая строка stdout передаётся в on_line; spinner=False
+    отключает спиннер, если вызывающий рисует свой прогресс. stderr копится
+    в буфере на каждой итерации, поэтому переполненный канал ошибок не
+    может заблокировать процесс. stdin_data (bytes) пишется в stdin процесса
+    по мере готовности канала в том же цикле, что и чтение, поэтому
+    большой ввод не приводит к взаимной блокировке. Возвращает
+    (код возврата, stderr).
+    """
+    # Читаем сырые дескрипторы по готовности: os.read отдаёт всё,
+    # что есть в канале, не дожидаясь перевода строки
+    out_fd = process.stdout.fileno()
+    err_fd = process.stderr.fileno()
+    os.set_blocking(out_fd, False)
+    os.set_blocking(err_fd, False)
+    sel = selectors.DefaultSelector()
+    sel.register(out_fd, selectors.EVENT_READ)
+    sel.register(err_fd, selectors.EVENT_READ)
+    in_fd = None
+    if stdin_data is not None:
+        in_fd = process.stdin.fileno()
+        os.set_blocking(in_fd, False)
+        sel.register(in_fd, selectors.EVENT_WRITE)
+        stdin_view = memoryview(stdin_data)
+    
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""  # Незавершённая строка вывода
+    error_buf = bytearray()
+    last_spin = 0.0
+    while sel.get_map():
+        printed = False
+        for key, _ in sel.select(timeout=SPINNER_INTERVAL):
+            if key.fd == in_fd:
+                # Как Popen.communicate: процесс, вышедший не дочитав ввод, не ошибка
+                try:
+                    stdin_view = stdin_view[os.write(in_fd, stdin_view[:65536]):]
+                except BlockingIOError:
+                    continue
+                except BrokenPipeError:
+                    stdin_view = stdin_view[:0]
+                if not stdin_view:
+                    sel.unregister(in_fd)
+                    process.stdin.close()
+                continue
+            try:
+                chunk = os.read(key.fd, 65536)
+            except BlockingIOError:
+                continue
+            if not chunk:
+                sel.unregister(key.fd)
+            elif key.fd == err_fd:
+                error_buf += chunk
+            else:
+                # pacman и mkfs обновляют прогресс через \r без \n
+                *lines, pending = _LINE_SPLIT.split(pending + decoder.decode(chunk))
+                for output_line in lines:
+                    if output_line.strip():
+                        on_line(output_line.strip())
+                        printed = True
+        
+        # Спиннер перерисовываем по таймеру, а не на каждую строку;
+        # пока команда что-то выводит, он не нужен вовсе
+        now = time.monotonic()
+        if spinner and not printed and now - last_spin >= SPINNER_INTERVAL:
+            sys.stdout.write(f"\r  {next(SPINNER)}")
+            sys.stdout.flush()
+            last_spin = now
+    sel.close()
+    process.stdout.close()
+    process.stderr.close()
+    
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        on_line(pending.strip())
+    if spinner:
+        sys.stdout.write("\r    \r")
+        sys.stdout.flush()
+    
+    error = error_buf.decode("utf-8", errors="replace")
+    return process.wait(), error
+
+def needs_shell(cmd):
+    """Проверяет, нужен ли /bin/sh для выполнения строки команды"""
+    if not cmd.strip() or _SHELL_CHARS.intersection(cmd):
+        return True
+    # VAR=value cmd — присваивание понимает только shell
+    return "=" in cmd.split(None, 1)[0]
+
+def run_command(cmd, exit_on_error=True, show_progress=False, progress_desc="", env=None, stdin_text=None):
+    """Выполняет команду с возможным отображением прогресса
+    
+    cmd — строка или список аргументов. Список и строка без
+    спецсимволов shell запускаются напрямую, без /bin/sh; остальные
+    строки выполняются через shell. env — дополнительные переменные
+    окружения для команды (в лог не пишутся), stdin_text — текст для stdin.
+    """
+    cmd_str = cmd if isinstance(cmd, str) else shlex.join(cmd)
+    if isinstance(cmd, str) and not needs_shell(cmd):
+        try:
+            cmd = shlex.split(cmd)
+        except ValueError:
+            # Незакрытая кавычка: пусть строку разбирает shell и сообщит об ошибке
+            pass
+    use_shell = isinstance(cmd, str)
+    log_message(f"Executing: {cmd_str}")
+    if env:
+        env = {**os.environ, **env}
     try:
         if show_progress:
             print(f"\n{progress_desc}")
             
             process = subprocess.Popen(
                 cmd, 
-                shell=True, 
+                shell=use_shell, 
+                env=env,
+                stdin=subprocess.PIPE if stdin_text is not None else None,
                 stdout=subprocess.PIPE, 
-                stderr=subprocess.PIPE, 
-                text=True
+                stderr=subprocess.PIPE
             )
+            stdin_data = stdin_text.encode() if stdin_text is not None else None
             
-            # Читаем вывод построчно
-            while True:
-                output_line = process.stdout.readline()
-                if output_line == '' and process.poll() is not None:
-                    break
-                if output_line:
-                    print(f"  {output_line.strip()}")
+            def show_line(line):
+                # Вывод идёт и на экран, и в лог
+                print(f"\r  {line}")
+                log_message(f"OUTPUT: {line}")
+            
+            returncode, error = stream_process(process, show_line, stdin_data=stdin_data)
                 
             # Обрабатываем ошибки
-            error = process.stderr.read()
             if error:
                 log_message(f"Command error: {error}")
                 print(f"  ERROR: {error.strip()}")
             
-            returncode = process.poll()
             if returncode != 0:
-                raise subprocess.CalledProcessError(returncode, cmd)
+                raise subprocess.CalledProcessError(returncode, cmd, stderr=error)
                 
             return ""
         else:
             result = subprocess.run(
                 cmd, 
-                shell=True, 
+                shell=use_shell, 
+                env=env,
+                input=stdin_text,
                 check=True, 
                 stdout=subprocess.PIPE, 
                 stderr=subprocess.PIPE, 
                 text=True
             )
-            log_command(cmd, result.stdout, result.stderr)
+            log_command(cmd_str, result.stdout, result.stderr)
             return result.stdout.strip()
     except subprocess.CalledProcessError as e:
-        log_message(f"Command failed: {cmd}")
+        log_message(f"Command failed: {cmd_str}")
         log_message(f"Error code: {e.returncode}")
         log_message(f"Error message: {e.stderr.strip()}")
         
-        print(f"\nОшибка выполнения команды: {cmd}")
+        print(f"\nОшибка выполнения команды: {cmd_str}")
         print(f"Код ошибки: {e.returncode}")
         print(f"Сообщение: {e.stderr.strip()}")
         if exit_on_error:
             sys.exit(1)
         return None
+    except FileNotFoundError:
+        # Без shell отсутствующая программа не даёт кода 127, а бросает исключение
+        log_message(f"Command not found: {cmd_str}")
+        print(f"\nКоманда не найдена: {cmd_str}")
+        if exit_on_error:
+            sys.exit(1)
+        return None
+
+def copy_file(src, dst, mode=None, owner=None):
+    """Копирует файл через os.sendfile и сразу выставляет права и владельца"""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        offset = 0
+        # Копирование целиком в ядре, без буферов Python
+        while offset < size:
+            sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+        if owner is not None:
+            os.fchown(fdst.fileno(), *owner)
+        if mode is not None:
+            os.fchmod(fdst.fileno(), mode)
+
+def copy_tree(src, dst):
+    """Рекурсивно копирует каталог, файлы — через copy_file (sendfile)"""
+    os.makedirs(dst, exist_ok=True)
+    # scandir отдаёт тип записи из самого каталога, без лишнего stat на файл
+    with os.scandir(src) as entries:
+        for entry in entries:
+            target = os.path.join(dst, entry.name)
+            if entry.is_dir():
+                copy_tree(entry.path, target)
+            else:
+                copy_file(entry.path, target)
+
+def get_target_ids(username, root="/mnt"):
+    """Возвращает (uid, gid) пользователя устанавливаемой системы"""
+    # pwd.getpwnam смотрит в /etc/passwd live-системы, поэтому читаем файл из root
+    with open(f"{root}/etc/passwd") as f:
+        for line in f:
+            fields = line.split(":")
+            if fields[0] == username:
+                return int(fields[2]), int(fields[3])
+    raise KeyError(f"Пользователь {username} не найден в {root}/etc/passwd")
 
-def install_packages(packages, desc="Установка пакетов"):
-    """Устанавливает пакеты с прогресс-баром"""
+def install_packages(packages, desc="Установка пакетов", root="/mnt"):
+    """Устанавливает пакеты в root одной транзакцией basestrap с прогресс-баром"""
     print(f"\n{desc}:")
-    total = len(packages)
-    progress = ProgressBar(total, desc, width=40)
+    progress = ProgressBar(len(packages), desc, width=40)
+    progress.update(0)
     
+    def on_line(line):
+        log_message(f"OUTPUT: {line}")
+        # Вместе с зависимостями пакетов больше, чем в списке
+        total = _PACMAN_TOTAL.match(line)
+        if total:
+            progress.total = int(total.group(1))
+        elif _PACMAN_INSTALLING.match(line) and progress.current < progress.total:
+            progress.increment()
+    
+    # Один вызов basestrap: одно разрешение зависимостей и одна загрузка базы.
+    # -c берёт пакеты из кэша live-системы, скачанное там не качается повторно
+    cmd = ["basestrap", "-c", root, *packages]
+    log_message(f"Executing: {shlex.join(cmd)}")
+    try:
+        process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env={**os.environ, "LC_ALL": "C"}  # Разбираем английский вывод
+        )
+    except OSError as e:
+        returncode, error = None, str(e)
+    else:
+        returncode, error = stream_process(process, on_line, spinner=False)
+    
+    if returncode == 0:
+        progress.complete()
+        return
+    
+    # Если общая транзакция не удалась, ставим пакеты по одному,
+    # чтобы run_command показал, на каком именно пакете ошибка
+    log_message(f"Batch install failed ({returncode}): {error}")
+    print("\nОбщая установка не удалась, устанавливаем пакеты по одному...")
+    progress = ProgressBar(len(packages), desc, width=40)
     for i, pkg in enumerate(packages):
         progress.update(i)
-        run_command(f"pacman -S --noconfirm {pkg}", show_progress=False)
-        time.sleep(0.1)  # Для плавности прогресса
+        run_command(["basestrap", "-c", root, "--needed", pkg])
         
     progress.complete()
 
@@ -246,49 +588,55 @@ def check_disk_type(disk):
     """Определяет тип диска (SSD/HDD) и выдает предупреждение"""
     try:
         disk_name = os.path.basename(disk)
-        with open(f'/sys/block/{disk_name}/queue/rotational', 'r') as f:
-            rotational = int(f.read().strip())
+        # Файл содержит один символ, поэтому читаем его без файлового объекта
+        fd = os.open(f'/sys/block/{disk_name}/queue/rotational', os.O_RDONLY)
+        try:
+            rotational = os.read(fd, 2)[:1]
+        finally:
+            os.close(fd)
         
-        if rotational == 1:
-            return "HDD (механический)"
-        else:
-            return "SSD (твердотельный)"
+        return disk_type_name(rotational == b'1')
     except Exception as e:
         return "Неизвестный"
 
+def disk_type_name(rotational):
+    """Название типа диска по признаку вращения"""
+    if rotational is None:
+        return "Неизвестный"
+    return "HDD (механический)" if rotational else "SSD (твердотельный)"
+
 def get_disks():
     """Возвращает список доступных дисков"""
+    output = run_command(["lsblk", "-d", "-J", "-o", "NAME,SIZE,MODEL,TYPE,ROTA"])
     disks = []
-    output = run_command("lsblk -d -o NAME,SIZE,MODEL,TYPE -n")
-    for line in output.split('\n'):
-        if line:
-            parts = line.split()
-            if len(parts) >= 3:
-                disk = {
-                    'name': parts[0],
-                    'size': parts[1],
-                    'model': ' '.join(parts[2:-1]),
-                    'type': parts[-1]
-                }
-                disks.append(disk)
+    for dev in json.loads(output)["blockdevices"]:
+        # Новые lsblk отдают ROTA как true/false, старые — как "1"/"0"
+        rota = dev.get("rota")
+        disks.append({
+            'name': dev["name"],
+            'size': dev.get("size") or "",
+            'model': (dev.get("model") or "").strip(),
+            'type': dev.get("type") or "",
+            'rota': None if rota is None else rota in (True, "1", 1)
+        })
     return disks
 
 def select_disk(disks):
     """Отображает меню выбора диска"""
     while True:
-        print_header()
         content = [f"{d['name']:6} {d['size']:8} {d['model'][:40]:40} {d['type']}" for d in disks]
-        print(draw_box("ДОСТУПНЫЕ ДИСКИ", content=content))
+        print_header(draw_box("ДОСТУПНЫЕ ДИСКИ", content=content))
         
         choice = input("\nВведите имя диска (например, sda, nvme0n1): ").strip()
         disk_path = f"/dev/{choice}"
         
         if os.path.exists(disk_path):
-            disk_type = check_disk_type(disk_path)
+            # Тип диска уже известен из lsblk; /sys читаем только для дисков не из списка
+            known = next((d for d in disks if d['name'] == choice and d['rota'] is not None), None)
+            disk_type = disk_type_name(known['rota']) if known else check_disk_type(disk_path)
             log_message(f"Selected disk: {disk_path} ({disk_type})")
             if "HDD" in disk_type:
-                print_header()
-                print(draw_box(
+                print_header(draw_box(
                     "ВНИМАНИЕ: МЕДЛЕННЫЙ ДИСК", 
                     content=[
                         "Обнаружен механический жесткий диск (HDD)!",
@@ -307,12 +655,16 @@ def select_disk(disks):
         else:
             print(f"Диск {disk_path} не существует!")
             log_message(f"Invalid disk selected: {disk_path}")
-            time.sleep(2)
+            ui_pause(1.5)
+
+def get_partition_info(disk):
+    """Возвращает список строк разделов из вывода fdisk -l"""
+    output = run_command(["fdisk", "-l", disk])
+    return _PARTITION_LINE.findall(output)
 
 def partition_disk(disk):
     """Выполняет разметку диска с помощью cfdisk"""
-    print_header()
-    print(draw_box(
+    print_header(draw_box(
         "РАЗМЕТКА ДИСКА", 
         content=[
             f"Будет запущен cfdisk для диска: {disk}",
@@ -326,22 +678,23 @@ def partition_disk(disk):
     ))
     input()
     
-    os.system(f"cfdisk {disk}")
+    subprocess.run(["cfdisk", disk])
     log_message(f"Partitioned disk: {disk}")
     
     # Показываем результат разметки
-    print_header()
-    print("РЕЗУЛЬТАТ РАЗМЕТКИ:")
-    partition_info = run_command(f"fdisk -l {disk} | grep '^/'")
-    print(partition_info)
-    log_message(f"Partition info:\n{partition_info}")
-    print("\nРазметка завершена. Нажмите Enter для продолжения...")
+    partition_info = get_partition_info(disk)
+    print_header(draw_box(
+        "РЕЗУЛЬТАТ РАЗМЕТКИ",
+        content=partition_info,
+        footer="Разметка завершена. Нажмите Enter для продолжения..."
+    ))
+    log_message("Partition info:\n" + "\n".join(partition_info))
     input()
+    return partition_info
 
 def format_partitions(uefi_mode, root_part, boot_part):
     """Форматирует разделы"""
-    print_header()
-    print(draw_box(
+    print_header(draw_box(
         "ФОРМАТИРОВАНИЕ РАЗДЕЛОВ", 
         content=[
             f"Корневой раздел: {root_part} -> ext4",
@@ -351,22 +704,28 @@ def format_partitions(uefi_mode, root_part, boot_part):
         ]
     ))
     
-    # Форматирование
+    # Форматирование: разделы независимы, поэтому mkfs запускаем параллельно
     if uefi_mode:
-        run_command(f"mkfs.fat -F32 {boot_part}", progress_desc="Форматирование EFI раздела")
+        boot_cmd = ["mkfs.fat", "-F32", boot_part]
     else:
-        run_command(f"mkfs.ext4 -F {boot_part}", progress_desc="Форматирование BOOT раздела")
+        boot_cmd = ["mkfs.ext4", "-F", boot_part]
+    root_cmd = ["mkfs.ext4", "-F", root_part]
     
-    run_command(f"mkfs.ext4 -F {root_part}", progress_desc="Форматирование ROOT раздела")
+    print("Форматирование разделов (параллельно)...")
+    # Один и тот же раздел одновременно форматировать нельзя
+    workers = 2 if boot_part != root_part else 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_command, cmd) for cmd in (boot_cmd, root_cmd)]
+        for future in futures:
+            future.result()
     
     print("✓ Форматирование завершено!")
-    time.sleep(1)
     log_message("Partitions formatted successfully")
+    log_flush()
 
 def mount_partitions(uefi_mode, root_part, boot_part):
     """Монтирует разделы"""
-    print_header()
-    print(draw_box(
+    print_header(draw_box(
         "МОНТИРОВАНИЕ РАЗДЕЛОВ", 
         content=[
             f"Монтирование корневого раздела: {root_part} -> /mnt",
@@ -376,25 +735,24 @@ def mount_partitions(uefi_mode, root_part, boot_part):
         ]
     ))
     
-    run_command(f"mount {root_part} /mnt", progress_desc="Монтирование корневого раздела")
+    run_command(["mount", root_part, "/mnt"], progress_desc="Монтирование корневого раздела")
     
     if uefi_mode:
         os.makedirs("/mnt/boot/efi", exist_ok=True)
-        run_command(f"mount {boot_part} /mnt/boot/efi", progress_desc="Монтирование EFI раздела")
+        run_command(["mount", boot_part, "/mnt/boot/efi"], progress_desc="Монтирование EFI раздела")
     else:
         os.makedirs("/mnt/boot", exist_ok=True)
-        run_command(f"mount {boot_part} /mnt/boot", progress_desc="Монтирование BOOT раздела")
+        run_command(["mount", boot_part, "/mnt/boot"], progress_desc="Монтирование BOOT раздела")
     
     print("✓ Монтирование завершено!")
-    time.sleep(1)
     log_message("Partitions mounted successfully")
+    log_flush()
 
-def set_password(username, is_root=False):
-    """Устанавливает пароль для пользователя с подтверждением"""
+def read_password(username, is_root=False):
+    """Запрашивает пароль для пользователя с подтверждением"""
     while True:
-        print_header()
         prompt = f"Установка пароля для {'ROOT' if is_root else username}"
-        print(draw_box(
+        print_header(draw_box(
             prompt,
             content=[
                 "Введите пароль:",
@@ -414,19 +772,52 @@ def set_password(username, is_root=False):
         password2 = getpass("")
         
         if password1 == password2:
-            if is_root:
-                run_command(f"echo 'root:{password1}' | artix-chroot /mnt chpasswd")
-            else:
-                run_command(f"echo '{username}:{password1}' | artix-chroot /mnt chpasswd")
-            log_message(f"Password set for {'root' if is_root else username}")
-            return
+            log_message(f"Password entered for {'root' if is_root else username}")
+            return password1
         else:
             print("Пароли не совпадают! Попробуйте снова.")
-            time.sleep(2)
+            ui_pause(2)
+
+def enable_parallel_downloads(conf_path):
+    """Включает ParallelDownloads в pacman.conf, если опция там закомментирована"""
+    # Строка есть только в конфиге pacman 6+, иначе остаётся обычная загрузка
+    try:
+        with open(conf_path) as f:
+            conf = f.read()
+        new_conf, count = _PARALLEL_DOWNLOADS.subn(
+            f"ParallelDownloads = {PARALLEL_DOWNLOADS}", conf, count=1
+        )
+        if not count:
+            return
+        with open(conf_path, "w") as f:
+            f.write(new_conf)
+        log_message(f"ParallelDownloads enabled in {conf_path}")
+    except OSError as e:
+        log_message(f"Не удалось изменить {conf_path}: {e}")
+
+def generate_fstab():
+    """Генерирует /mnt/etc/fstab"""
+    tmp_path = "/mnt/etc/fstab.tmp"
+    try:
+        os.makedirs("/mnt/etc", exist_ok=True)
+        # Вывод fstabgen пишется прямо во временный файл, без копии в памяти;
+        # fstab заменяется только при успехе, иначе остаётся прежним
+        with open(tmp_path, "w") as f:
+            result = subprocess.run(["fstabgen", "-U", "/mnt"], stdout=f, stderr=subprocess.PIPE, text=True)
+        if result.returncode == 0:
+            os.replace(tmp_path, "/mnt/etc/fstab")
+            log_message("fstab сгенерирован и записан.")
+        else:
+            os.remove(tmp_path)
+            log_command("fstabgen -U /mnt", None, result.stderr)
+            log_message("Ошибка генерации fstab")
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        log_message(f"Исключение при генерации fstab: {str(e)}")
 
 def install_base_system(username, uefi_mode, disk, boot_part):
     """Устанавливает базовую систему"""
-    print_header()
     content = [
         "Установка базовой системы с runit...",
         "",
@@ -436,7 +827,7 @@ def install_base_system(username, uefi_mode, disk, boot_part):
         "grub os-prober efibootmgr networkmanager-runit fish mc htop",
         "wget curl git iwd terminus-font"
     ]
-    print(draw_box("УСТАНОВКА СИСТЕМЫ", content=content))
+    print_header(draw_box("УСТАНОВКА СИСТЕМЫ", content=content))
     
     # Установка пакетов с прогресс-баром
     packages = [
@@ -446,67 +837,53 @@ def install_base_system(username, uefi_mode, disk, boot_part):
         "wget", "curl", "git", "iwd", "terminus-font"
     ]
     
+    # Пакеты качаются параллельно; целевой системе достаётся та же настройка
+    enable_parallel_downloads("/etc/pacman.conf")
     install_packages(packages, "Установка системных пакетов")
+    enable_parallel_downloads("/mnt/etc/pacman.conf")
+    log_flush()
     
     # Настройка fstab
     print("Генерация fstab...")
-    def generate_fstab():
-        try:
-            os.makedirs("/mnt/etc", exist_ok=True)
-            result = subprocess.run(["fstabgen", "-U", "/mnt"], capture_output=True, text=True)
-            if result.returncode == 0:
-                with open("/mnt/etc/fstab", "w") as f:
-                    f.write(result.stdout)
-                log_message("fstab сгенерирован и записан.")
-            else:
-                log_command("fstabgen -U /mnt", result.stdout, result.stderr)
-                log_message("Ошибка генерации fstab")
-        except Exception as e:
-        log_message(f"Исключение при генерации fstab: {str(e)}")
- 
-    # Создание пользователя
-    print(f"Создание пользователя {username}...")
-    run_command(f"artix-chroot /mnt useradd -m -G wheel -s /bin/bash {username}", progress_desc="Создание пользователя")
-    run_command(f"artix-chroot /mnt usermod -aG audio,video,input,storage,optical,lp,scanner {username}")
+    generate_fstab()
     
-    # Установка паролей
-    set_password(username, is_root=False)
-    set_password(username, is_root=True)
+    # Пароли запрашиваем заранее: пользователь создаётся в chroot-скрипте
+    user_password = read_password(username, is_root=False)
+    root_password = read_password(username, is_root=True)
+    
+    # Настройка chroot (пользователь, пароли, система, загрузчик)
+    setup_chroot(username, uefi_mode, disk, boot_part, user_password, root_password)
     
     # Копирование файлов
     print("Копирование системных файлов...")
     try:
         # Копируем из директории установщика
-        shutil.copytree(os.path.join(INSTALLER_DIR, "pixmap"), 
-                       "/mnt/usr/share/pixmap", 
-                       dirs_exist_ok=True)
+        copy_tree(os.path.join(INSTALLER_DIR, "pixmap"), "/mnt/usr/share/pixmap")
         
-        # Копируем скрипты установки
-        for script in ["INSTALL.sh", "INST.sh"]:
-            src = os.path.join(INSTALLER_DIR, script)
-            if os.path.exists(src):
-                shutil.copy(src, f"/mnt/home/{username}/")
-                run_command(f"chown {username}:{username} /mnt/home/{username}/{script}")
-                run_command(f"chmod +x /mnt/home/{username}/{script}")
-                log_message(f"Copied {script} to /mnt/home/{username}/")
+        # Копируем скрипты установки и systemctl одним проходом:
+        # (источник, назначение, права, владелец)
+        user_ids = get_target_ids(username)
+        copies = [
+            (os.path.join(INSTALLER_DIR, script), f"/mnt/home/{username}/{script}", 0o755, user_ids)
+            for script in ["INSTALL.sh", "INST.sh"]
+        ]
+        copies.append((os.path.join(INSTALLER_DIR, "systemctl"), "/mnt/usr/local/bin/systemctl", 0o755, None))
         
-        # Копируем systemctl
-        systemctl_src = os.path.join(INSTALLER_DIR, "systemctl")
-        if os.path.exists(systemctl_src):
-            shutil.copy(systemctl_src, "/mnt/usr/local/bin/")
-            os.chmod("/mnt/usr/local/bin/systemctl", 0o755)
-            log_message("Copied systemctl to /mnt/usr/local/bin/")
+        for src, dst, mode, owner in copies:
+            if not os.path.exists(src):
+                continue
+            copy_file(src, dst, mode, owner)
+            log_message(f"Copied {os.path.basename(src)} to {os.path.dirname(dst)}/")
     except Exception as e:
         log_message(f"Error copying files: {str(e)}")
         print(f"Ошибка копирования файлов: {e}")
-        time.sleep(2)
+        ui_pause(2)
     
-    # Настройка chroot
-    setup_chroot(username, uefi_mode, disk, boot_part)
+    # Всё записанное за фазу сбрасываем на диск одним sync, а не по файлу
+    os.sync()
     
     # Финализация
-    print_header()
-    print(draw_box(
+    print_header(draw_box(
         "УСТАНОВКА ЗАВЕРШЕНА", 
         content=[
             "Базовая система успешно установлена!",
@@ -520,18 +897,30 @@ def install_base_system(username, uefi_mode, disk, boot_part):
     ))
     input()
     log_message("Base system installation completed")
+    log_flush()
 
-def setup_chroot(username, uefi_mode, disk, boot_part):
-    """Выполняет настройку внутри chroot"""
+def setup_chroot(username, uefi_mode, disk, boot_part, user_password, root_password):
+    """Выполняет настройку внутри chroot за один вход в artix-chroot"""
+    # Пароли передаются через окружение, а не в тексте скрипта или командной строке
     chroot_script = f"""#!/bin/bash
+# Скрипт читается bash из stdin: команда, читающая stdin, съест его остаток,
+# поэтому внешним программам stdin закрываем через </dev/null
+# Пользователь и пароли (без них продолжать нельзя, поэтому || exit 1)
+useradd -m -G wheel -s /bin/bash {username} || exit 1
+usermod -aG audio,video,input,storage,optical,lp,scanner {username} || exit 1
+printf '%s:%s\\n' "{username}" "$QUASAR_USER_PW" | chpasswd || exit 1
+printf 'root:%s\\n' "$QUASAR_ROOT_PW" | chpasswd || exit 1
+# Пароли больше не нужны, остальным командам их окружение не передаём
+unset QUASAR_USER_PW QUASAR_ROOT_PW
+
 # Настройка времени
 ln -sf /usr/share/zoneinfo/Europe/Moscow /etc/localtime
-hwclock --systohc
+hwclock --systohc </dev/null
 
 # Локализация
 echo "en_US.UTF-8 UTF-8" >> /etc/locale.gen
 echo "ru_RU.UTF-8 UTF-8" >> /etc/locale.gen
-locale-gen
+locale-gen </dev/null
 echo "LANG=ru_RU.UTF-8" > /etc/locale.conf
 
 # Сеть
@@ -564,7 +953,7 @@ if [ {uefi_mode} -eq 1 ]; then
     mkdir -p /boot/efi/EFI/GRUB
     
     # Устанавливаем GRUB
-    grub-install --target=x86_64-efi --efi-directory=/boot/efi --bootloader-id=GRUB --recheck
+    grub-install --target=x86_64-efi --efi-directory=/boot/efi --bootloader-id=GRUB --recheck </dev/null
     
     # Проверка установки
     if [ ! -f /boot/efi/EFI/GRUB/grubx64.efi ]; then
@@ -573,13 +962,13 @@ if [ {uefi_mode} -eq 1 ]; then
     fi
 else
     echo "Установка GRUB для BIOS..."
-    grub-install --target=i386-pc {disk} --recheck
+    grub-install --target=i386-pc {disk} --recheck </dev/null
 fi
 
 # Генерация конфигурации GRUB
 echo "Генерация конфига GRUB..."
 sed -i 's/GRUB_DISTRIBUTOR=.*/GRUB_DISTRIBUTOR="Quasar Linux"/' /etc/default/grub
-grub-mkconfig -o /boot/grub/grub.cfg
+grub-mkconfig -o /boot/grub/grub.cfg </dev/null
 
 # Проверка конфигурации
 if [ ! -f /boot/grub/grub.cfg ]; then
@@ -602,20 +991,25 @@ fi
 EOF
 """
     
-    # Сохраняем и выполняем скрипт
-    with open("/mnt/chroot_setup.sh", "w") as f:
-        f.write(chroot_script)
-    
-    os.chmod("/mnt/chroot_setup.sh", 0o755)
+    # Скрипт передаём bash внутри chroot через stdin, на диск он не пишется
     print("Настройка chroot-окружения...")
-    run_command("artix-chroot /mnt /chroot_setup.sh", progress_desc="Выполнение chroot-скрипта")
-    os.remove("/mnt/chroot_setup.sh")
+    run_command(
+        ["artix-chroot", "/mnt", "/bin/bash", "-s"],
+        show_progress=True,  # Вывод locale-gen и grub виден на экране и целиком попадает в лог
+        progress_desc="Выполнение chroot-скрипта",
+        env={"QUASAR_USER_PW": user_password, "QUASAR_ROOT_PW": root_password},
+        stdin_text=chroot_script
+    )
     log_message("Chroot setup completed")
+    log_flush()
 
 def main():
     # Инициализация логов
     log_init()
     
+    # Размер терминала перечитываем только при его изменении
+    signal.signal(signal.SIGWINCH, _on_winch)
+    
     # Проверка прав
     if os.geteuid() != 0:
         print("Этот скрипт должен запускаться с правами root!")
@@ -630,11 +1024,10 @@ def main():
     log_message(f"Boot mode detected: {boot_mode}")
     
     # Установка шрифта
-    run_command("pacman -Sy terminus-font --noconfirm", progress_desc="Установка шрифтов")
-    run_command("setfont ter-v20n")
+    run_command(["pacman", "-Sy", "terminus-font", "--noconfirm"], show_progress=True, progress_desc="Установка шрифтов")
+    run_command(["setfont", "ter-v20n"])
     
-    print_header()
-    print(draw_box(
+    print_header(draw_box(
         "РЕЖИМ ЗАГРУЗКИ", 
         content=[f"Обнаружен режим загрузки: {boot_mode}"],
         footer="Нажмите Enter для продолжения..."
@@ -645,15 +1038,11 @@ def main():
     disks = get_disks()
     disk = select_disk(disks)
     
-    # Разметка диска
-    partition_disk(disk)
+    # Разметка диска (таблица разделов после cfdisk уже не меняется)
+    partition_info = partition_disk(disk)
     
     # Выбор разделов
-    print_header()
-    print("СПИСОК РАЗДЕЛОВ:")
-    partition_info = run_command(f"fdisk -l {disk} | grep '^/'")
-    print(partition_info)
-    log_message(f"Partition info:\n{partition_info}")
+    print_header(draw_box("СПИСОК РАЗДЕЛОВ", content=partition_info))
     
     print("\n")
     root_part = input("Введите раздел для ROOT (например, /dev/sda2): ").strip()
@@ -676,9 +1065,10 @@ def main():
     
     # Очистка
     print("Завершение установки...")
-    run_command("umount -R /mnt", exit_on_error=False, progress_desc="Размонтирование разделов")
+    run_command(["umount", "-R", "/mnt"], exit_on_error=False, progress_desc="Размонтирование разделов")
     print("✓ Установка завершена! Перезагрузите систему.")
     log_message("Installation completed successfully")
+    log_flush()
 
 if __name__ == "__main__":
     main()